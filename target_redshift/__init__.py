@@ -3,11 +3,14 @@
 import argparse
 import bz2
 import copy
+import functools
 import gzip
 import io
 import json
 import os
 import sys
+import time
+from collections import deque
 from datetime import datetime
 from decimal import Decimal
 from itertools import islice
@@ -19,6 +22,21 @@ from singer import get_logger
 
 from target_redshift.db_sync import DbSync
 
+# orjson decodes Singer messages several times faster than stdlib json, but it is
+# kept optional because wheels are missing on some platforms (see the singer-python
+# version pin in setup.py). orjson.JSONDecodeError subclasses json.JSONDecodeError
+# so the error handling below works with either decoder.
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 __version__ = '1.0.1'
 
 LOGGER = get_logger('target_redshift')
@@ -38,18 +56,78 @@ class InvalidValidationOperationException(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=4096)
+def _float_to_decimal(value):
+    """Bounded per-value cache: feeds repeat the same floats (prices,
+    quantities, flags) constantly, so most conversions become lookups.
+    Spelled exactly like Decimal(str(value)) so output is unchanged."""
+    return Decimal(str(value))
+
+
+def _float_to_decimal_walk(root):
+    """Copy a list/dict tree converting floats to Decimal, using an explicit
+    stack instead of recursion so deep payloads cannot hit RecursionError."""
+    # Cache globals as locals for the tight loop
+    to_decimal = _float_to_decimal
+    result = [] if type(root) is list else {}
+    stack = deque([(root, result)])
+    while stack:
+        src, dst = stack.pop()
+        if type(src) is list:
+            for value in src:
+                value_type = type(value)
+                if value_type is float:
+                    dst.append(to_decimal(value))
+                elif value_type is list or value_type is dict:
+                    child = [] if value_type is list else {}
+                    dst.append(child)
+                    stack.append((value, child))
+                else:
+                    dst.append(value)
+        else:
+            for key, value in src.items():
+                value_type = type(value)
+                if value_type is float:
+                    dst[key] = to_decimal(value)
+                elif value_type is list or value_type is dict:
+                    child = [] if value_type is list else {}
+                    dst[key] = child
+                    stack.append((value, child))
+                else:
+                    dst[key] = value
+    return result
+
+
 def float_to_decimal(value):
     """Walk the given data structure and turn all instances of float into
     double."""
     if isinstance(value, float):
-        return Decimal(str(value))
-    if isinstance(value, list):
-        return [float_to_decimal(child) for child in value]
-    if isinstance(value, dict):
-        return {k: float_to_decimal(v) for k, v in value.items()}
+        return _float_to_decimal(value)
+    if isinstance(value, (list, dict)):
+        # Serialize-and-reparse pushes the whole container walk into C code:
+        # floats come back as Decimal via the parse hooks while every other
+        # scalar round-trips unchanged. stdlib json is used rather than orjson
+        # because orjson silently serializes NaN/Infinity as null, whereas
+        # json.dumps emits literals that parse_constant turns into the same
+        # Decimal('NaN')/Decimal('Infinity') the scalar path produces
+        try:
+            return json.loads(
+                json.dumps(value), parse_float=Decimal, parse_constant=Decimal)
+        except TypeError:
+            pass  # non-JSON-native values: fall back to the Python walk
+        return _float_to_decimal_walk(value)
     return value
 
 
+# Metadata _sdc column definitions according to the stitch documentation at
+# https://www.stitchdata.com/docs/data-structure/integration-schemas#sdc-columns
+_METADATA_COLUMNS = {
+    '_sdc_extracted_at': {'type': ['null', 'string'], 'format': 'date-time'},
+    '_sdc_batched_at': {'type': ['null', 'string'], 'format': 'date-time'},
+    '_sdc_deleted_at': {'type': ['null', 'string']},
+}
+
+
 def add_metadata_columns_to_schema(schema_message):
     """Metadata _sdc columns according to the stitch documentation at
     https://www.stitchdata.com/docs/data-structure/integration-schemas#sdc-columns
@@ -57,22 +135,36 @@ def add_metadata_columns_to_schema(schema_message):
     Metadata columns gives information about data injections
     """
     extended_schema_message = schema_message
-    extended_schema_message['schema']['properties']['_sdc_extracted_at'] = {'type': ['null', 'string'],
-                                                                            'format': 'date-time'}
-    extended_schema_message['schema']['properties']['_sdc_batched_at'] = {'type': ['null', 'string'],
-                                                                          'format': 'date-time'}
-    extended_schema_message['schema']['properties']['_sdc_deleted_at'] = {'type': ['null', 'string']}
+    # Copy each column definition so mutating one stream's schema cannot leak
+    # into the shared template (or other streams)
+    extended_schema_message['schema']['properties'].update(
+        (column, definition.copy()) for column, definition in _METADATA_COLUMNS.items())
 
     return extended_schema_message
 
 
+# (monotonic timestamp, iso string) of the last _sdc_batched_at formatting;
+# refreshed at most once per second
+_batched_at_cache = (0.0, '')
+
+
+def _batched_at_now():
+    global _batched_at_cache
+    cached_at, iso_string = _batched_at_cache
+    now = time.monotonic()
+    if now - cached_at >= 1.0:
+        iso_string = datetime.now().isoformat()
+        _batched_at_cache = (now, iso_string)
+    return iso_string
+
+
 def add_metadata_values_to_record(record_message, stream_to_sync):
     """Populate metadata _sdc columns from incoming record message
     The location of the required attributes are fixed in the stream
     """
     extended_record = record_message['record']
     extended_record['_sdc_extracted_at'] = record_message.get('time_extracted')
-    extended_record['_sdc_batched_at'] = datetime.now().isoformat()
+    extended_record['_sdc_batched_at'] = _batched_at_now()
     extended_record['_sdc_deleted_at'] = record_message.get('record', {}).get('_sdc_deleted_at')
 
     return extended_record
@@ -80,13 +172,22 @@ def add_metadata_values_to_record(record_message, stream_to_sync):
 
 def emit_state(state):
     if state is not None:
-        line = json.dumps(state)
+        line = _json_dumps(state)
         LOGGER.info('Emitting state {}'.format(line))
-        sys.stdout.write("{}\n".format(line))
+        sys.stdout.write(line + '\n')
         sys.stdout.flush()
 
 
+# Keyed by id() of the config dict; the config reference is kept in the value
+# so the id cannot be recycled while the entry is alive
+_schema_names_cache = {}
+
+
 def get_schema_names_from_config(config):
+    cached = _schema_names_cache.get(id(config))
+    if cached is not None and cached[0] is config:
+        return list(cached[1])
+
     default_target_schema = config.get('default_target_schema')
     schema_mapping = config.get('schema_mapping', {})
     schema_names = []
@@ -98,7 +199,13 @@ def get_schema_names_from_config(config):
         for source_schema, target in schema_mapping.items():
             schema_names.append(target.get('target_schema'))
 
-    return schema_names
+    _schema_names_cache[id(config)] = (config, schema_names)
+    return list(schema_names)
+
+
+def get_unique_schema_names_from_config(config):
+    # Order-preserving dedup; schema_mapping entries can repeat target schemas
+    return list(dict.fromkeys(get_schema_names_from_config(config)))
 
 
 def load_table_cache(config):
@@ -108,7 +215,7 @@ def load_table_cache(config):
 
         db = DbSync(config)
         table_cache = db.get_table_columns(
-            filter_schemas=get_schema_names_from_config(config))
+            filter_schemas=get_unique_schema_names_from_config(config))
 
     return table_cache
 
@@ -122,14 +229,20 @@ def persist_lines(config, lines, table_cache=None) -> None:
     validators = {}
     records_to_load = {}
     row_count = {}
+    batch_bytes = {}
     stream_to_sync = {}
     total_row_count = {}
     batch_size_rows = config.get('batch_size_rows', DEFAULT_BATCH_SIZE_ROWS)
 
+    # Optional upper bound on the approximate amount of buffered record bytes per
+    # stream. Flushing on size as well as on row count keeps memory usage bounded
+    # when record sizes vary wildly between streams.
+    batch_size_bytes = config.get('batch_size_bytes')
+
     # Loop over lines from stdin
     for line in lines:
         try:
-            o = json.loads(line)
+            o = _json_loads(line)
         except json.decoder.JSONDecodeError:
             LOGGER.error("Unable to parse:\n{}".format(line))
             raise
@@ -179,7 +292,11 @@ def persist_lines(config, lines, table_cache=None) -> None:
             else:
                 records_to_load[stream][primary_key_string] = o['record']
 
-            if row_count[stream] >= batch_size_rows:
+            # the raw line length is a good-enough estimate of the buffered record size
+            batch_bytes[stream] = batch_bytes.get(stream, 0) + len(line)
+
+            if row_count[stream] >= batch_size_rows or \
+                    (batch_size_bytes and batch_bytes[stream] >= batch_size_bytes):
                 # flush all streams, delete records if needed, reset counts and then emit current state
                 if config.get('flush_all_streams'):
                     filter_streams = None
@@ -196,6 +313,10 @@ def persist_lines(config, lines, table_cache=None) -> None:
                     flushed_state,
                     filter_streams=filter_streams)
 
+                # reset byte counters of the flushed streams
+                for flushed_stream in filter_streams or batch_bytes:
+                    batch_bytes[flushed_stream] = 0
+
                 # emit last encountered state
                 emit_state(copy.deepcopy(flushed_state))
 
@@ -213,6 +334,7 @@ def persist_lines(config, lines, table_cache=None) -> None:
             # so previous records need to be flushed
             if row_count.get(stream, 0) > 0:
                 flushed_state = flush_streams(records_to_load, row_count, stream_to_sync, config, state, flushed_state)
+                batch_bytes = {flushed_stream: 0 for flushed_stream in batch_bytes}
 
                 # emit latest encountered state
                 emit_state(flushed_state)
@@ -244,6 +366,7 @@ def persist_lines(config, lines, table_cache=None) -> None:
             stream_to_sync[stream].sync_table()
 
             row_count[stream] = 0
+            batch_bytes[stream] = 0
             total_row_count[stream] = 0
 
         elif t == 'ACTIVATE_VERSION':
@@ -299,17 +422,13 @@ def flush_streams(
     # of threads where the number of threads is the number of streams that need to
     # be loaded but it's not greater than the value of max_parallelism
     if parallelism == 0:
-        n_streams_to_flush = len(streams.keys())
-        if n_streams_to_flush > max_parallelism:
-            parallelism = max_parallelism
-        else:
-            parallelism = n_streams_to_flush
+        parallelism = min(len(streams), max_parallelism)
 
     # Select the required streams to flush
     if filter_streams:
         streams_to_flush = filter_streams
     else:
-        streams_to_flush = streams.keys()
+        streams_to_flush = streams
 
     # Single-host, thread-based parallelism
     with parallel_backend('threading', n_jobs=parallelism):
@@ -409,8 +528,7 @@ def flush_records(stream, records_to_load, row_count, db_sync, compression=None,
         _, csv_file = mkstemp(suffix=file_extension + "." + str(chunk_number), prefix=f'{stream}_', dir=temp_dir)
         csv_files = csv_files + [csv_file]
         with open_method(csv_file, "w+b") as csv_f:
-            for record in chunk:
-                csv_line = db_sync.record_to_csv_line(record)
+            for csv_line in db_sync.records_to_csv_lines(chunk):
                 csv_f.write(bytes(csv_line + "\n", "UTF-8"))
         s3_key = db_sync.put_to_s3(
             csv_file,
@@ -1,41 +1,71 @@
-import collections.abc
-import itertools
+import collections
+import functools
+import glob
+import hashlib
 import json
 import os
 import re
 import sys
+import threading
 import time
+from contextlib import contextmanager
 
-import boto3
 import inflection
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from singer import get_logger
 
 DEFAULT_VARCHAR_LENGTH = 10000
 SHORT_VARCHAR_LENGTH = 256
 LONG_VARCHAR_LENGTH = 65535
 
-
-def validate_config(config):
-    errors = []
-    required_config_keys = [
-        'host',
-        'port',
-        'user',
-        'password',
-        'dbname'
-    ]
-
-    # Check if mandatory keys exist
-    for k in required_config_keys:
-        if not config.get(k, None):
-            errors.append("Required key is missing from config: [{}]".format(k))
+DEFAULT_MAX_POOL = 16  # Max pooled connections per DSN, matches DEFAULT_MAX_PARALLELISM
+
+
+def _pool_size(connection_config):
+    """Connections the pool must be able to hand out at once.
+
+    ThreadedConnectionPool raises PoolError instead of blocking when it is
+    exhausted, so the pool has to be at least as large as the effective flush
+    parallelism or configurations with parallelism above max_pool would crash
+    mid-flush."""
+    parallelism = connection_config.get('parallelism', 0)
+    if parallelism < 0:
+        # Negative values follow the joblib n_jobs convention:
+        # -1 means one thread per core, -2 one less than that, and so on
+        parallelism = max((os.cpu_count() or 1) + 1 + parallelism, 1)
+    elif parallelism == 0:
+        # Auto parallelism is capped by max_parallelism in flush_streams
+        parallelism = connection_config.get('max_parallelism', DEFAULT_MAX_POOL)
+
+    return max(connection_config.get('max_pool', DEFAULT_MAX_POOL), parallelism)
+
+# Mandatory connection settings checked by validate_config
+REQUIRED_CONFIG_KEYS = [
+    'host',
+    'port',
+    'user',
+    'password',
+    'dbname'
+]
+
+
+def validate_config(config, max_errors=None):
+    # Check if mandatory keys exist. A plain set difference on config.keys()
+    # would be a single C call but misses keys that are present with empty
+    # values, which must also count as missing
+    errors = ["Required key is missing from config: [{}]".format(k)
+              for k in REQUIRED_CONFIG_KEYS if not config.get(k, None)]
+    if max_errors and len(errors) >= max_errors:
+        return errors
 
     # Check for S3 config or local copy mode
     use_local_copy = config.get('use_local_copy', False)
     if not use_local_copy and not config.get('s3_bucket', None):
         errors.append("Either 's3_bucket' or 'use_local_copy' must be configured.")
+        if max_errors and len(errors) >= max_errors:
+            return errors
 
     # Check target schema config
     config_default_target_schema = config.get('default_target_schema', None)
@@ -48,11 +78,22 @@ def validate_config(config):
 
 def column_type(schema_property, with_length=True):
     property_type = schema_property['type']
-    property_format = schema_property['format'] if 'format' in schema_property else None
+
+    # Memoize on a hashable projection of the schema property: streams repeat the
+    # same handful of type/format combinations for every column and every ALTER
+    # comparison, so repeated calls collapse into one cache lookup
+    return _column_type(
+        tuple(property_type) if isinstance(property_type, list) else property_type,
+        schema_property.get('format'),
+        schema_property.get('maxLength', 0) > DEFAULT_VARCHAR_LENGTH,
+        with_length
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _column_type(property_type, property_format, long_varchar, with_length):
     column_type = 'character varying'
-    varchar_length = DEFAULT_VARCHAR_LENGTH
-    if schema_property.get('maxLength', 0) > varchar_length:
-        varchar_length = LONG_VARCHAR_LENGTH
+    varchar_length = LONG_VARCHAR_LENGTH if long_varchar else DEFAULT_VARCHAR_LENGTH
 
     # Check for explicit SUPER type marker (in type field or format field)
     if 'super' in property_type or property_format == 'super':
@@ -90,7 +131,16 @@ def column_type(schema_property, with_length=True):
 
 def column_trans(schema_property):
     property_type = schema_property['type']
-    property_format = schema_property['format'] if 'format' in schema_property else None
+
+    # Same hashable-projection memoization as column_type
+    return _column_trans(
+        tuple(property_type) if isinstance(property_type, list) else property_type,
+        schema_property.get('format')
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _column_trans(property_type, property_format):
     column_trans = ''
 
     # SUPER type doesn't need parse_json transformation
@@ -102,8 +152,11 @@ def column_trans(schema_property):
     return column_trans
 
 
+@functools.lru_cache(maxsize=4096)
 def safe_column_name(name):
-    return '"{}"'.format(name).upper()
+    # Interned so repeated dict lookups keyed on column names can take the
+    # pointer-identity fast path
+    return sys.intern('"{}"'.format(name).upper())
 
 
 def column_clause(name, schema_property):
@@ -111,57 +164,116 @@ def column_clause(name, schema_property):
 
 
 def flatten_key(k, parent_key, sep):
-    full_key = parent_key + [k]
+    # Records repeat the same key paths over and over; memoize on a tuple
+    # projection of the parent key list
+    return _flatten_key(k, tuple(parent_key), sep)
+
+
+@functools.lru_cache(maxsize=4096)
+def _flatten_key(k, parent_key, sep):
+    full_key = list(parent_key) + [k]
     inflected_key = full_key.copy()
+    # Join once per iteration and reuse it; the common short-key case exits
+    # with a single C-level join and no re-join on return
+    flat_key = sep.join(inflected_key)
     reducer_index = 0
-    while len(sep.join(inflected_key)) >= 127 and reducer_index < len(inflected_key):
+    while len(flat_key) >= 127 and reducer_index < len(inflected_key):
         reduced_key = re.sub(r'[a-z]', '', inflection.camelize(inflected_key[reducer_index]))
         inflected_key[reducer_index] = \
             (reduced_key if len(reduced_key) > 1 else inflected_key[reducer_index][0:3]).lower()
         reducer_index += 1
+        flat_key = sep.join(inflected_key)
 
-    return sep.join(inflected_key)
+    # The inflection pass can fail to get under Redshift's 127-character
+    # identifier limit (e.g. names without lowercase characters to strip).
+    # Guarantee the limit by truncating and appending a digest of the original
+    # key, so distinct source columns cannot collapse into one identifier
+    if len(flat_key) >= 127:
+        key_hash = hashlib.blake2s(sep.join(full_key).encode('utf-8'), digest_size=8).hexdigest()
+        flat_key = '{}_{}'.format(flat_key[:109], key_hash)
+
+    # Flattened keys become record dict keys for every row; interning gives
+    # those lookups the pointer-identity fast path
+    return sys.intern(flat_key)
 
 
 def flatten_schema(d, parent_key=[], sep='__', level=0, max_level=0):
     items = []
+    seen_keys = set()
+
+    # Iterative traversal: nested objects go back on the queue instead of
+    # recursing, and duplicate detection is a set lookup rather than a
+    # sort-and-groupby pass over the accumulated items
+    queue = collections.deque([(d, list(parent_key), level)])
+    while queue:
+        node, node_parent_key, node_level = queue.popleft()
+        if 'properties' not in node:
+            continue
+
+        for k, v in node['properties'].items():
+            if 'type' in v:
+                if 'object' in v['type'] and 'properties' in v and node_level < max_level:
+                    queue.append((v, node_parent_key + [k], node_level + 1))
+                    continue
+                new_key = flatten_key(k, node_parent_key, sep)
+                flattened_property = v
+            else:
+                if len(v.values()) == 0:
+                    continue
+                anyof_property = list(v.values())[0][0]
+                if anyof_property['type'] == 'string':
+                    anyof_property['type'] = ['null', 'string']
+                elif anyof_property['type'] == 'array':
+                    anyof_property['type'] = ['null', 'array']
+                elif anyof_property['type'] == 'object':
+                    anyof_property['type'] = ['null', 'object']
+                else:
+                    continue
+                new_key = flatten_key(k, node_parent_key, sep)
+                flattened_property = anyof_property
 
-    if 'properties' not in d:
-        return {}
+            if new_key in seen_keys:
+                raise ValueError('Duplicate column name produced in schema: {}'.format(new_key))
+            seen_keys.add(new_key)
+            items.append((new_key, flattened_property))
+
+    return dict(sorted(items))
+
+
+# Keyed by id() of the flattened schema; the schema reference is kept in the
+# value so the id cannot be recycled while the entry is alive. Bounded because
+# re-emitted SCHEMA messages produce fresh dicts whose stale entries would
+# otherwise accumulate for the lifetime of the process.
+_json_dump_keys_cache = {}
+_JSON_DUMP_KEYS_CACHE_MAX = 64
+
+
+def _json_dump_keys(flatten_schema):
+    cached = _json_dump_keys_cache.get(id(flatten_schema))
+    if cached is not None and cached[0] is flatten_schema:
+        return cached[1]
+
+    keys = frozenset(
+        key for key, value in flatten_schema.items()
+        if 'type' in value and set(value['type']) == {'null', 'object', 'array'})
+    if len(_json_dump_keys_cache) >= _JSON_DUMP_KEYS_CACHE_MAX:
+        # Wholesale reset instead of per-entry LRU bookkeeping: the recompute
+        # is cheap and live schemas repopulate on their next record
+        _json_dump_keys_cache.clear()
+    _json_dump_keys_cache[id(flatten_schema)] = (flatten_schema, keys)
+    return keys
 
-    for k, v in d['properties'].items():
-        new_key = flatten_key(k, parent_key, sep)
-        if 'type' in v.keys():
-            if 'object' in v['type'] and 'properties' in v and level < max_level:
-                items.extend(flatten_schema(v, parent_key + [k], sep=sep, level=level+1, max_level=max_level).items())
-            else:
-                items.append((new_key, v))
-        else:
-            if len(v.values()) > 0:
-                if list(v.values())[0][0]['type'] == 'string':
-                    list(v.values())[0][0]['type'] = ['null', 'string']
-                    items.append((new_key, list(v.values())[0][0]))
-                elif list(v.values())[0][0]['type'] == 'array':
-                    list(v.values())[0][0]['type'] = ['null', 'array']
-                    items.append((new_key, list(v.values())[0][0]))
-                elif list(v.values())[0][0]['type'] == 'object':
-                    list(v.values())[0][0]['type'] = ['null', 'object']
-                    items.append((new_key, list(v.values())[0][0]))
-
-    key_func = lambda item: item[0]
-    sorted_items = sorted(items, key=key_func)
-    for k, g in itertools.groupby(sorted_items, key=key_func):
-        if len(list(g)) > 1:
-            raise ValueError('Duplicate column name produced in schema: {}'.format(k))
-
-    return dict(sorted_items)
+
+# Exact-type membership: record values come from JSON decoding so they are
+# always plain dicts/lists, and type(v) in tuple skips the isinstance MRO walk
+_JSON_DUMP_TYPES = (dict, list)
 
 
 def _should_json_dump_value(key, value, flatten_schema=None):
-    if isinstance(value, (dict, list)):
+    if type(value) in _JSON_DUMP_TYPES:
         return True
 
-    if flatten_schema and key in flatten_schema and 'type' in flatten_schema[key] and set(flatten_schema[key]['type']) == {'null', 'object', 'array'}:
+    if flatten_schema and key in _json_dump_keys(flatten_schema):
         return True
 
     return False
@@ -169,21 +281,32 @@ def _should_json_dump_value(key, value, flatten_schema=None):
 
 #pylint: disable-msg=too-many-arguments
 def flatten_record(d, flatten_schema=None, parent_key=[], sep='__', level=0, max_level=0):
-    items = []
-    for k, v in d.items():
-        new_key = flatten_key(k, parent_key, sep)
-        if isinstance(v, collections.abc.MutableMapping) and level < max_level:
-            items.extend(flatten_record(v, flatten_schema, parent_key + [k], sep=sep, level=level + 1, max_level=max_level).items())
-        else:
-            items.append((new_key, json.dumps(v) if _should_json_dump_value(k, v, flatten_schema) else v))
-    return dict(items)
+    # Iterative traversal into a single output dict: nested mappings go back on
+    # the queue instead of recursing, avoiding per-level frames and the
+    # intermediate dicts the recursive version merged together
+    out = {}
+    queue = collections.deque([(list(parent_key), d, level)])
+    dumps = json.dumps
+    should_dump = _should_json_dump_value
+    while queue:
+        node_parent_key, node, node_level = queue.popleft()
+        for k, v in node.items():
+            # Records come from JSON decoding, so nested mappings are always
+            # plain dicts; the concrete-type check skips the ABC dispatch
+            if isinstance(v, dict) and node_level < max_level:
+                queue.append((node_parent_key + [k], v, node_level + 1))
+            else:
+                new_key = flatten_key(k, node_parent_key, sep)
+                out[new_key] = dumps(v) if should_dump(k, v, flatten_schema) else v
+    return out
 
 
 def primary_column_names(stream_schema_message):
     return [safe_column_name(p) for p in stream_schema_message['key_properties']]
 
 
-def stream_name_to_dict(stream_name, separator='-'):
+@functools.lru_cache(maxsize=1024)
+def _stream_name_parts(stream_name, separator):
     catalog_name = None
     schema_name = None
     table_name = stream_name
@@ -198,6 +321,14 @@ def stream_name_to_dict(stream_name, separator='-'):
         schema_name = s[1]
         table_name = '_'.join(s[2:])
 
+    return catalog_name, schema_name, table_name
+
+
+def stream_name_to_dict(stream_name, separator='-'):
+    # The same handful of stream names is parsed on every record, so the split
+    # is memoized; a fresh dict is returned so callers can mutate it safely
+    catalog_name, schema_name, table_name = _stream_name_parts(stream_name, separator)
+
     return {
         'catalog_name': catalog_name,
         'schema_name': schema_name,
@@ -207,6 +338,24 @@ def stream_name_to_dict(stream_name, separator='-'):
 
 # pylint: disable=too-many-public-methods,too-many-instance-attributes
 class DbSync:
+    # One instance exists per stream per flush; slots drop the per-instance
+    # __dict__ and make the hot self.* reads in the CSV path offset loads
+    __slots__ = (
+        'connection_config',
+        'stream_schema_message',
+        'table_cache',
+        'logger',
+        'use_local_copy',
+        's3',
+        's3_transfer_config',
+        'skip_updates',
+        'primary_key_required',
+        'schema_name',
+        'grantees',
+        'data_flattening_max_level',
+        'flatten_schema',
+    )
+
     def __init__(self, connection_config, stream_schema_message=None, table_cache=None):
         """
             connection_config:      Redshift connection details
@@ -246,6 +395,11 @@ class DbSync:
 
         # Init S3 client only if not using local copy mode
         if not self.use_local_copy:
+            # Deferred import: loading boto3 costs a noticeable amount of
+            # startup time and local copy mode never needs it
+            import boto3
+            import boto3.s3.transfer
+
             aws_profile = self.connection_config.get('aws_profile') or os.environ.get('AWS_PROFILE')
             aws_access_key_id = self.connection_config.get('aws_access_key_id') or os.environ.get('AWS_ACCESS_KEY_ID')
             aws_secret_access_key = self.connection_config.get('aws_secret_access_key') or os.environ.get('AWS_SECRET_ACCESS_KEY')
@@ -269,8 +423,19 @@ class DbSync:
                 aws_session = boto3.session.Session(profile_name=aws_profile)
 
             self.s3 = aws_session.client('s3')
+
+            # Multipart upload settings shared by every put_to_s3 call: large
+            # slices are split into 16MB parts uploaded concurrently instead of
+            # one synchronous stream
+            self.s3_transfer_config = boto3.s3.transfer.TransferConfig(
+                multipart_threshold=8 * 1024 * 1024,
+                multipart_chunksize=16 * 1024 * 1024,
+                max_concurrency=min(self.connection_config.get('max_parallelism', 16), 16),
+                use_threads=True
+            )
         else:
             self.s3 = None
+            self.s3_transfer_config = None
             self.logger.info("Using local file copy mode - S3 client disabled")
 
         self.skip_updates = self.connection_config.get('skip_updates', False)
@@ -304,8 +469,11 @@ class DbSync:
 
             stream_name = stream_schema_message['stream']
             stream_schema_name = stream_name_to_dict(stream_name)['schema_name']
-            if config_schema_mapping and stream_schema_name in config_schema_mapping:
-                self.schema_name = config_schema_mapping[stream_schema_name].get('target_schema')
+            # Resolve this stream's mapping entry once; schema and grantees
+            # lookups below reuse it instead of re-probing the mapping dict
+            stream_mapping = config_schema_mapping.get(stream_schema_name) if config_schema_mapping else None
+            if stream_mapping is not None:
+                self.schema_name = stream_mapping.get('target_schema')
             elif config_default_target_schema:
                 self.schema_name = config_default_target_schema
 
@@ -332,12 +500,40 @@ class DbSync:
             #                                                               }
             #                                                           }
             self.grantees = self.connection_config.get('default_target_schema_select_permissions')
-            if config_schema_mapping and stream_schema_name in config_schema_mapping:
-                self.grantees = config_schema_mapping[stream_schema_name].get('target_schema_select_permissions', self.grantees)
+            if stream_mapping is not None:
+                self.grantees = stream_mapping.get('target_schema_select_permissions', self.grantees)
 
             self.data_flattening_max_level = self.connection_config.get('data_flattening_max_level', 0)
             self.flatten_schema = flatten_schema(stream_schema_message['schema'], max_level=self.data_flattening_max_level)
 
+    # Connection pools shared across DbSync instances, keyed by connection string.
+    # Streams are flushed on threads (joblib threading backend) so the pools must be
+    # the thread-safe variant.
+    _connection_pools = {}
+    _connection_pools_lock = threading.Lock()
+
+    @classmethod
+    def _get_connection_pool(cls, conn_string, maxconn):
+        with cls._connection_pools_lock:
+            pool = cls._connection_pools.get(conn_string)
+            if pool is None:
+                # Dict-style rows are configured once per connection here instead of
+                # per cursor at every call site
+                pool = psycopg2.pool.ThreadedConnectionPool(
+                    1, maxconn, conn_string, cursor_factory=psycopg2.extras.DictCursor)
+                cls._connection_pools[conn_string] = pool
+
+        return pool
+
+    @classmethod
+    def close_pools(cls):
+        """Close every pooled connection. Used by test teardown and clean shutdowns"""
+        with cls._connection_pools_lock:
+            for pool in cls._connection_pools.values():
+                pool.closeall()
+            cls._connection_pools.clear()
+
+    @contextmanager
     def open_connection(self):
         conn_string = "host='{}' dbname='{}' user='{}' password='{}' port='{}'".format(
             self.connection_config['host'],
@@ -347,12 +543,20 @@ class DbSync:
             self.connection_config['port']
         )
 
-        return psycopg2.connect(conn_string)
+        pool = self._get_connection_pool(conn_string, _pool_size(self.connection_config))
+        connection = pool.getconn()
+        try:
+            # The connection context manager keeps the usual transaction semantics:
+            # COMMIT on clean exit, ROLLBACK on exception
+            with connection:
+                yield connection
+        finally:
+            pool.putconn(connection)
 
     def query(self, query, params=None):
         self.logger.debug("Running query: {}".format(query))
         with self.open_connection() as connection:
-            with connection.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+            with connection.cursor() as cur:
                 cur.execute(
                     query,
                     params
@@ -388,13 +592,25 @@ class DbSync:
         return ','.join(key_props)
 
     def record_to_csv_line(self, record):
-        flatten = flatten_record(record, self.flatten_schema, max_level=self.data_flattening_max_level)
-        return ','.join(
-            [
-                json.dumps(flatten[name], ensure_ascii=False) if name in flatten and (flatten[name] == 0 or flatten[name]) else ''
-                for name in self.flatten_schema
-            ]
-        )
+        return next(self.records_to_csv_lines([record]))
+
+    def records_to_csv_lines(self, records):
+        """Generate CSV lines for a batch of records. Column order, flattening
+        settings and the serializer are bound once per batch instead of being
+        re-resolved for every record"""
+        columns = list(self.flatten_schema)
+        flatten_schema_ = self.flatten_schema
+        max_level = self.data_flattening_max_level
+        dumps = json.dumps
+        for record in records:
+            flatten = flatten_record(record, flatten_schema_, max_level=max_level)
+            get = flatten.get
+            yield ','.join(
+                [
+                    dumps(value, ensure_ascii=False) if (value == 0 or value) else ''
+                    for value in (get(name) for name in columns)
+                ]
+            )
 
     def put_to_s3(self, file, stream, count, suffix = ""):
         # If using local copy mode, just return the local file path
@@ -413,7 +629,7 @@ class DbSync:
         self.logger.info("Target S3 bucket: {}, local file: {}, S3 key: {}".format(bucket, file, s3_key))
 
         extra_args = {'ACL': s3_acl} if s3_acl else None
-        self.s3.upload_file(file, bucket, s3_key, ExtraArgs=extra_args)
+        self.s3.upload_file(file, bucket, s3_key, ExtraArgs=extra_args, Config=self.s3_transfer_config)
 
         return s3_key
 
@@ -445,8 +661,12 @@ class DbSync:
             for (name, schema) in self.flatten_schema.items()
         ]
 
+        # The whole flush (stage table DDL, COPY, merge and stage drop) runs on a single
+        # connection inside the connection context manager, i.e. in one transaction with
+        # one COMMIT at the end. Keep it that way: per-statement commits would pay one
+        # WAL fsync per statement and would leave a half-loaded stage table on failure.
         with self.open_connection() as connection:
-            with connection.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+            with connection.cursor() as cur:
                 inserts = 0
                 updates = 0
 
@@ -469,7 +689,6 @@ class DbSync:
 
                     # Find all sliced files matching the pattern (e.g., file.csv.1, file.csv.2, etc.)
                     # s3_key in local mode is the base path without the slice number
-                    import glob
                     pattern = s3_key + '.*'
                     matching_files = glob.glob(pattern)
 
@@ -482,10 +701,12 @@ class DbSync:
 
                     self.logger.debug(f"Loading {len(matching_files)} file(s) from local filesystem")
 
-                    # Load each sliced file
+                    # Load each sliced file. The files are streamed as raw bytes:
+                    # decoding them to str only for psycopg2 to re-encode on the wire
+                    # would double the per-row string work for no benefit.
                     for file_path in sorted(matching_files):
                         self.logger.debug(f"Loading file: {file_path}")
-                        with open(file_path, 'r') as f:
+                        with open(file_path, 'rb') as f:
                             cur.copy_expert(copy_sql, f)
                 else:
                     # Redshift S3 COPY command
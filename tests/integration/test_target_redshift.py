@@ -1,10 +1,10 @@
 import pytest
 import os
 import json
-import mock
 import datetime
 import time
 from contextlib import contextmanager
+from unittest import mock
 
 import target_redshift
 from target_redshift import RecordValidationException
@@ -0,0 +1,61 @@
+"""
+Shared pytest fixtures for the mock integration tests.
+
+The PostgreSQL container itself is managed outside pytest (`make docker-up` /
+docker-compose); these fixtures make sure the readiness poll is paid once per
+session instead of once per test class, and give tests a clean target schema
+without re-checking container availability.
+"""
+import pytest
+
+import target_redshift
+from target_redshift.db_sync import DbSync
+
+try:
+    import tests.mock_integration.utils as test_utils
+except ImportError:
+    import utils as test_utils
+
+
+@pytest.fixture(scope='session')
+def mock_db_config():
+    """Wait for PostgreSQL once per session and share the connection config"""
+    config = test_utils.get_mock_db_config()
+    if not test_utils.wait_for_postgres(config, max_retries=30, retry_delay=2):
+        pytest.skip("PostgreSQL is not available")
+
+    yield config
+
+    # Release the pooled connections held open across the session
+    DbSync.close_pools()
+
+
+def _load_into_schema(mock_db_config, schema_suffix, **config_overrides):
+    """Run persist_lines once into a dedicated schema and return the config used"""
+    config = dict(mock_db_config)
+    config['default_target_schema'] = '{}_{}'.format(config['default_target_schema'], schema_suffix)
+    config.update(config_overrides)
+
+    db = DbSync(config)
+    db.query("DROP SCHEMA IF EXISTS {} CASCADE".format(config['default_target_schema']))
+
+    tap_lines = test_utils.get_test_tap_lines('messages-with-three-streams.json')
+    target_redshift.persist_lines(config, tap_lines)
+
+    return config
+
+
+@pytest.fixture(scope='session')
+def loaded_three_streams(mock_db_config):
+    """messages-with-three-streams.json loaded once per session (read-only tests)
+
+    Tests that mutate the loaded data (upserts, soft deletes, schema evolution)
+    must keep loading into the per-test schema instead of using this fixture.
+    """
+    return _load_into_schema(mock_db_config, 'three_streams')
+
+
+@pytest.fixture(scope='session')
+def loaded_three_streams_meta(mock_db_config):
+    """Same fixture data loaded once with add_metadata_columns enabled"""
+    return _load_into_schema(mock_db_config, 'three_streams_meta', add_metadata_columns=True)
@@ -16,36 +16,107 @@ except ImportError:
     import utils as test_utils
 
 
+def _assert_simple_table(postgres, target_schema):
+    """Basic data types land correctly in a simple table"""
+    # Note: Tables are created with uppercase names and quoted in Redshift style
+    table_one = postgres.query(
+        'SELECT * FROM {}."TEST_TABLE_ONE" ORDER BY "C_PK"'.format(target_schema)
+    )
+
+    # Check that we got the expected data
+    assert len(table_one) == 1
+    # Column names are also uppercase when created with quotes
+    assert table_one[0]['C_PK'] == 1
+    assert table_one[0]['C_INT'] == 1
+    assert table_one[0]['C_VARCHAR'] == '1'
+
+
+def _assert_metadata_columns(postgres, target_schema):
+    """Metadata columns exist when add_metadata_columns is enabled"""
+    table_one = postgres.query(
+        'SELECT * FROM {}."TEST_TABLE_ONE" ORDER BY "C_PK"'.format(target_schema)
+    )
+
+    # Check metadata columns exist (uppercase names)
+    assert '_SDC_EXTRACTED_AT' in table_one[0]
+    assert '_SDC_BATCHED_AT' in table_one[0]
+    assert '_SDC_DELETED_AT' in table_one[0]
+
+
+def _assert_multiple_streams(postgres, target_schema):
+    """All three streams were created and loaded"""
+    table_one = postgres.query(
+        'SELECT COUNT(*) as cnt FROM {}."TEST_TABLE_ONE"'.format(target_schema)
+    )
+    assert table_one[0]['cnt'] == 1
+
+    table_two = postgres.query(
+        'SELECT COUNT(*) as cnt FROM {}."TEST_TABLE_TWO"'.format(target_schema)
+    )
+    assert table_two[0]['cnt'] == 2
+
+    # Table name gets sanitized to remove hyphens
+    table_three = postgres.query(
+        'SELECT COUNT(*) as cnt FROM {}."TEST_TABLE_THREE"'.format(target_schema)
+    )
+    assert table_three[0]['cnt'] == 3
+
+
 class TestTargetRedshiftMock:
     """
     Mock Integration Tests for Target Redshift using PostgreSQL
     """
 
-    @classmethod
-    def setup_class(cls):
-        """Wait for PostgreSQL to be ready before running tests"""
-        config = test_utils.get_mock_db_config()
-        if not test_utils.wait_for_postgres(config, max_retries=30, retry_delay=2):
-            pytest.skip("PostgreSQL is not available")
-
-    def setup_method(self):
-        """Setup test database"""
-        self.config = test_utils.get_mock_db_config()
+    @pytest.fixture(autouse=True)
+    def clean_schema(self, request, mock_db_config):
+        """Setup test database with a clean target schema
+
+        Container readiness is checked once per session by the `mock_db_config`
+        fixture; here we only reset the target schema. The config is copied so
+        tests can tweak flags (e.g. add_metadata_columns) without leaking into
+        other tests.
+
+        The default reset truncates the existing test tables, which only drops
+        the table segments instead of rewriting the catalog the way
+        DROP SCHEMA ... CASCADE does. Tests that assert on table structure
+        (e.g. schema evolution) opt into the full drop with
+        @pytest.mark.full_reset.
+
+        Schemas that no test has written to since the last reset are tracked in
+        _clean_schemas, so pure-read tests don't pay the reset round-trips at
+        all. Unknown schemas (e.g. leftovers from a previous run) are always
+        reset.
+        """
+        self.config = dict(mock_db_config)
         postgres = DbSync(self.config)
+        schema = self.config["default_target_schema"]
 
-        # Drop target schema
-        if self.config["default_target_schema"]:
+        if schema and schema not in self._clean_schemas:
             try:
-                postgres.query(
-                    "DROP SCHEMA IF EXISTS {} CASCADE".format(
-                        self.config["default_target_schema"]
+                if request.node.get_closest_marker('full_reset'):
+                    postgres.query("DROP SCHEMA IF EXISTS {} CASCADE".format(schema))
+                else:
+                    tables = postgres.query(
+                        "SELECT schemaname, tablename FROM pg_tables WHERE schemaname = %s",
+                        (schema,)
                     )
-                )
+                    if tables:
+                        postgres.query(
+                            "TRUNCATE TABLE {} RESTART IDENTITY CASCADE".format(
+                                ', '.join('{}."{}"'.format(t['schemaname'], t['tablename']) for t in tables)
+                            )
+                        )
+                TestTargetRedshiftMock._clean_schemas.add(schema)
             except Exception as e:
-                print(f"Warning: Could not drop schema: {e}")
+                print(f"Warning: Could not reset schema: {e}")
 
-    def teardown_method(self):
-        pass
+    # Schemas known to hold no test data; clean_schema skips resetting these
+    _clean_schemas = set()
+
+    def persist(self, tap_lines):
+        """Load tap lines into the test schema and mark it as needing a reset"""
+        target_redshift.persist_lines(self.config, tap_lines)
+        TestTargetRedshiftMock._clean_schemas.discard(self.config['default_target_schema'])
 
     def test_connection(self):
         """Test that we can connect to PostgreSQL"""
@@ -53,50 +124,19 @@ class TestTargetRedshiftMock:
         result = postgres.query("SELECT 1 as test")
         assert result[0]['test'] == 1
 
-    def test_loading_simple_table(self):
-        """Test loading a simple table with basic data types"""
-        # Use the same test data as regular integration tests
-        tap_lines = test_utils.get_test_tap_lines("messages-with-three-streams.json")
-
-        # Load data
-        target_redshift.persist_lines(self.config, tap_lines)
-
-        # Verify data was loaded
-        postgres = DbSync(self.config)
-        target_schema = self.config.get("default_target_schema", "")
-
-        # Note: Tables are created with uppercase names and quoted in Redshift style
-        table_one = postgres.query(
-            'SELECT * FROM {}."TEST_TABLE_ONE" ORDER BY "C_PK"'.format(target_schema)
-        )
-
-        # Check that we got the expected data
-        assert len(table_one) == 1
-        # Column names are also uppercase when created with quotes
-        assert table_one[0]['C_PK'] == 1
-        assert table_one[0]['C_INT'] == 1
-        assert table_one[0]['C_VARCHAR'] == '1'
-
-    def test_loading_with_metadata_columns(self):
-        """Test loading data with metadata columns enabled"""
-        tap_lines = test_utils.get_test_tap_lines("messages-with-three-streams.json")
-
-        # Enable metadata columns
-        self.config["add_metadata_columns"] = True
-        target_redshift.persist_lines(self.config, tap_lines)
-
-        # Verify metadata columns exist
-        postgres = DbSync(self.config)
-        target_schema = self.config.get("default_target_schema", "")
-
-        table_one = postgres.query(
-            'SELECT * FROM {}."TEST_TABLE_ONE" ORDER BY "C_PK"'.format(target_schema)
-        )
+    @pytest.mark.parametrize('fixture_name, assertion', [
+        ('loaded_three_streams', _assert_simple_table),
+        ('loaded_three_streams', _assert_multiple_streams),
+        ('loaded_three_streams_meta', _assert_metadata_columns),
+    ], ids=['simple-table', 'multiple-streams', 'metadata-columns'])
+    def test_three_streams_load(self, request, fixture_name, assertion):
+        """Test the session-scoped three-streams load from several angles
 
-        # Check metadata columns exist (uppercase names)
-        assert '_SDC_EXTRACTED_AT' in table_one[0]
-        assert '_SDC_BATCHED_AT' in table_one[0]
-        assert '_SDC_DELETED_AT' in table_one[0]
+        The expensive persist_lines run happens once per session in the named
+        fixture; each parametrized case only runs its SELECTs and assertions.
+        """
+        config = request.getfixturevalue(fixture_name)
+        assertion(DbSync(config), config.get("default_target_schema", ""))
 
     def test_use_local_copy_flag(self):
         """Test that use_local_copy flag is properly set"""
@@ -115,7 +155,7 @@ class TestTargetRedshiftMock:
         """Test loading unicode characters"""
         tap_lines = test_utils.get_test_tap_lines("messages-with-unicode-characters.json")
 
-        target_redshift.persist_lines(self.config, tap_lines)
+        self.persist(tap_lines)
 
         postgres = DbSync(self.config)
         target_schema = self.config.get("default_target_schema", "")
@@ -149,7 +189,7 @@ class TestTargetRedshiftMock:
         """Test loading nested objects and arrays (stored as JSON strings)"""
         tap_lines = test_utils.get_test_tap_lines("messages-with-nested-schema.json")
 
-        target_redshift.persist_lines(self.config, tap_lines)
+        self.persist(tap_lines)
 
         postgres = DbSync(self.config)
         target_schema = self.config.get("default_target_schema", "")
@@ -184,7 +224,7 @@ class TestTargetRedshiftMock:
         """Test that upsert operations work correctly (updates and deletes)"""
         # First load initial data
         tap_lines_initial = test_utils.get_test_tap_lines("messages-with-three-streams.json")
-        target_redshift.persist_lines(self.config, tap_lines_initial)
+        self.persist(tap_lines_initial)
 
         postgres = DbSync(self.config)
         target_schema = self.config.get("default_target_schema", "")
@@ -197,7 +237,7 @@ class TestTargetRedshiftMock:
 
         # Now load upsert data (updates some records, adds soft deletes)
         tap_lines_upsert = test_utils.get_test_tap_lines("messages-with-three-streams-upserts.json")
-        target_redshift.persist_lines(self.config, tap_lines_upsert)
+        self.persist(tap_lines_upsert)
 
         # Verify updates were applied
         upsert_result = postgres.query(
@@ -214,36 +254,7 @@ class TestTargetRedshiftMock:
         pk2_record = [r for r in upsert_result if r['C_PK'] == 2][0]
         assert pk2_record['C_VARCHAR'] == '2_UPDATED'
 
-    @pytest.mark.skipif(
-        not os.path.exists(os.path.join(os.path.dirname(__file__), '..', 'integration', 'resources')),
-        reason="Integration test resources not available"
-    )
-    def test_multiple_streams(self):
-        """Test loading multiple streams in a single run"""
-        tap_lines = test_utils.get_test_tap_lines("messages-with-three-streams.json")
-
-        target_redshift.persist_lines(self.config, tap_lines)
-
-        postgres = DbSync(self.config)
-        target_schema = self.config.get("default_target_schema", "")
-
-        # Verify all three tables were created and loaded
-        table_one = postgres.query(
-            'SELECT COUNT(*) as cnt FROM {}."TEST_TABLE_ONE"'.format(target_schema)
-        )
-        assert table_one[0]['cnt'] == 1
-
-        table_two = postgres.query(
-            'SELECT COUNT(*) as cnt FROM {}."TEST_TABLE_TWO"'.format(target_schema)
-        )
-        assert table_two[0]['cnt'] == 2
-
-        # Table name gets sanitized to remove hyphens
-        table_three = postgres.query(
-            'SELECT COUNT(*) as cnt FROM {}."TEST_TABLE_THREE"'.format(target_schema)
-        )
-        assert table_three[0]['cnt'] == 3
-
+    @pytest.mark.full_reset
     @pytest.mark.skipif(
         not os.path.exists(os.path.join(os.path.dirname(__file__), '..', 'integration', 'resources')),
         reason="Integration test resources not available"
@@ -252,7 +263,7 @@ class TestTargetRedshiftMock:
         """Test that schema changes are handled correctly"""
         # First load with initial schema
         tap_lines_initial = test_utils.get_test_tap_lines("messages-with-three-streams.json")
-        target_redshift.persist_lines(self.config, tap_lines_initial)
+        self.persist(tap_lines_initial)
 
         postgres = DbSync(self.config)
         target_schema = self.config.get("default_target_schema", "")
@@ -279,7 +290,7 @@ class TestTargetRedshiftMock:
 
         # Load data with modified schema (columns changed/added)
         tap_lines_modified = test_utils.get_test_tap_lines("messages-with-three-streams-modified-column.json")
-        target_redshift.persist_lines(self.config, tap_lines_modified)
+        self.persist(tap_lines_modified)
 
         # Get new column count for TEST_TABLE_TWO
         modified_columns = postgres.query(
@@ -315,7 +326,7 @@ class TestTargetRedshiftMock:
         """Test that non-database-friendly column names are handled correctly"""
         tap_lines = test_utils.get_test_tap_lines("messages-with-non-db-friendly-columns.json")
 
-        target_redshift.persist_lines(self.config, tap_lines)
+        self.persist(tap_lines)
 
         postgres = DbSync(self.config)
         target_schema = self.config.get("default_target_schema", "")
@@ -345,7 +356,7 @@ class TestTargetRedshiftMock:
         """Test that SQL reserved words can be used as table names"""
         tap_lines = test_utils.get_test_tap_lines("messages-with-reserved-name-as-table-name.json")
 
-        target_redshift.persist_lines(self.config, tap_lines)
+        self.persist(tap_lines)
 
         postgres = DbSync(self.config)
         target_schema = self.config.get("default_target_schema", "")
@@ -361,7 +372,7 @@ class TestTargetRedshiftMock:
         # Load initial data with metadata columns enabled
         self.config["add_metadata_columns"] = True
         tap_lines_initial = test_utils.get_test_tap_lines("messages-with-three-streams.json")
-        target_redshift.persist_lines(self.config, tap_lines_initial)
+        self.persist(tap_lines_initial)
 
         postgres = DbSync(self.config)
         target_schema = self.config.get("default_target_schema", "")
@@ -374,7 +385,7 @@ class TestTargetRedshiftMock:
 
         # Load data with soft deletes (hard_delete=False, which is default)
         tap_lines_upsert = test_utils.get_test_tap_lines("messages-with-three-streams-upserts.json")
-        target_redshift.persist_lines(self.config, tap_lines_upsert)
+        self.persist(tap_lines_upsert)
 
         # Count records - soft delete should preserve all records
         final_count = postgres.query(
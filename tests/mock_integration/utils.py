@@ -2,14 +2,16 @@
 Utilities for mock integration tests using PostgreSQL in Docker.
 This allows testing without requiring actual Redshift and S3 infrastructure.
 """
+import functools
 import os
 import json
 
 
-def get_mock_db_config():
+@functools.lru_cache(maxsize=None)
+def _build_mock_db_config():
     """
-    Get configuration for mock PostgreSQL database.
-    Uses Docker PostgreSQL instead of Redshift and local files instead of S3.
+    Build the mock database config once per process.
+    The environment is only read on the first call.
     """
     config = {}
 
@@ -21,6 +23,12 @@ def get_mock_db_config():
     config['dbname'] = os.environ.get('MOCK_TARGET_DBNAME', 'test_db')
     config['default_target_schema'] = os.environ.get('MOCK_TARGET_SCHEMA', 'test_target_schema')
 
+    # Give every pytest-xdist worker its own target schema so the tests can run
+    # in parallel against the shared container without stepping on each other
+    xdist_worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if xdist_worker:
+        config['default_target_schema'] = '{}_{}'.format(config['default_target_schema'], xdist_worker)
+
     # Enable local copy mode (no S3)
     config['use_local_copy'] = True
 
@@ -35,26 +43,36 @@ def get_mock_db_config():
     return config
 
 
+def get_mock_db_config():
+    """
+    Get configuration for mock PostgreSQL database.
+    Uses Docker PostgreSQL instead of Redshift and local files instead of S3.
+
+    Returns a fresh copy so tests can tweak flags without affecting each other.
+    """
+    return dict(_build_mock_db_config())
+
+
+@functools.lru_cache(maxsize=None)
 def get_test_tap_lines(filename):
     """
     Load test tap lines from resource files.
     Reuses the same test data as regular integration tests.
+
+    Results are cached per file so repeated loads of the same fixture don't
+    re-read and re-parse it; the immutable tuple guards against accidental
+    mutation between tests.
     """
-    lines = []
     # Try to load from integration test resources first
     integration_path = os.path.join(os.path.dirname(__file__), '..', 'integration', 'resources', filename)
     if os.path.exists(integration_path):
         with open(integration_path) as tap_stdout:
-            for line in tap_stdout.readlines():
-                lines.append(line)
-    else:
-        # Fallback to mock_integration resources
-        mock_path = os.path.join(os.path.dirname(__file__), 'resources', filename)
-        with open(mock_path) as tap_stdout:
-            for line in tap_stdout.readlines():
-                lines.append(line)
-
-    return lines
+            return tuple(tap_stdout.readlines())
+
+    # Fallback to mock_integration resources
+    mock_path = os.path.join(os.path.dirname(__file__), 'resources', filename)
+    with open(mock_path) as tap_stdout:
+        return tuple(tap_stdout.readlines())
 
 
 def wait_for_postgres(config, max_retries=30, retry_delay=1):
@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.fixture
+def base_record_message():
+    """Typical Singer RECORD message; function scoped because
+    add_metadata_values_to_record mutates the record in place"""
+    return {
+        'type': 'RECORD',
+        'stream': 'test_stream',
+        'record': {
+            'id': 1,
+            'name': 'Test'
+        },
+        'time_extracted': '2024-01-15T10:30:00Z'
+    }
+
+
+@pytest.fixture(scope='session')
+def minimal_config():
+    """Smallest configuration that passes validate_config"""
+    return {
+        'host':                     "dummy-value",
+        'port':                     5439,
+        'user':                     "dummy-value",
+        'password':                 "dummy-value",
+        'dbname':                   "dummy-value",
+        'aws_access_key_id':        "dummy-value",
+        'aws_secret_access_key':    "dummy-value",
+        's3_bucket':                "dummy-value",
+        'default_target_schema':    "dummy-value"
+    }
@@ -1,5 +1,4 @@
 import pytest
-import mock
 import target_redshift
 
 
@@ -7,29 +6,10 @@ class TestTargetRedshift(object):
     """
     Unit Tests for Target Redshift
     """
-    def setup_method(self):
-        self.config = {}
-
-
-    def teardown_method(self):
-        pass
-
-
-    def test_config_validation(self):
+    def test_config_validation(self, minimal_config):
         """Test configuration validator"""
         validator = target_redshift.db_sync.validate_config
         empty_config = {}
-        minimal_config = {
-            'host':                     "dummy-value",
-            'port':                     5439,
-            'user':                     "dummy-value",
-            'password':                 "dummy-value",
-            'dbname':                   "dummy-value",
-            'aws_access_key_id':        "dummy-value",
-            'aws_secret_access_key':    "dummy-value",
-            's3_bucket':                "dummy-value",
-            'default_target_schema':    "dummy-value"
-        }
 
         # Config validator returns a list of errors
         # If the list is empty then the configuration is valid otherwise invalid
@@ -56,59 +36,40 @@ class TestTargetRedshift(object):
         assert len(validator(config_with_schema_mapping)) == 0
 
 
-    def test_column_type_mapping(self):
+    # Mapping from JSON schema types ot Redshift column types
+    @pytest.mark.parametrize('schema_property, expected_type', [
+        ({"type": ["string"]},                              'character varying(10000)'),
+        ({"type": ["string", "null"]},                      'character varying(10000)'),
+        ({"type": ["string"], "format": "date-time"},       'timestamp without time zone'),
+        ({"type": ["string", "null"], "format": "date-time"}, 'timestamp without time zone'),
+        ({"type": ["string"], "format": "time"},            'character varying(256)'),
+        ({"type": ["string", "null"], "format": "time"},    'character varying(256)'),
+        ({"type": ["number"]},                              'double precision'),
+        ({"type": ["integer"]},                             'numeric'),
+        ({"type": ["integer", "string"]},                   'character varying(65535)'),
+        ({"type": ["boolean"]},                             'boolean'),
+        ({"type": ["object"]},                              'character varying(65535)'),
+        ({"type": ["array"]},                               'character varying(65535)'),
+        ({"type": "super"},                                 'super'),
+        ({"type": ["super"]},                               'super'),
+        ({"type": ["super", "null"]},                       'super'),
+        ({"type": ["object"], "format": "super"},           'super'),
+        # maxLength exceeding DEFAULT_VARCHAR_LENGTH widens the varchar
+        ({"type": ["string"], "maxLength": 50000},          'character varying(65535)'),
+    ])
+    def test_column_type_mapping(self, schema_property, expected_type):
         """Test JSON type to Redshift column type mappings"""
-        mapper = target_redshift.db_sync.column_type
-
-        # Incoming JSON schema types
-        json_str =          {"type": ["string"]             }
-        json_str_or_null =  {"type": ["string", "null"]     }
-        json_dt =           {"type": ["string"]             , "format": "date-time"}
-        json_dt_or_null =   {"type": ["string", "null"]     , "format": "date-time"}
-        json_t =            {"type": ["string"]             , "format": "time"}
-        json_t_or_null =    {"type": ["string", "null"]     , "format": "time"}
-        json_num =          {"type": ["number"]             }
-        json_int =          {"type": ["integer"]            }
-        json_int_or_str =   {"type": ["integer", "string"]  }
-        json_bool =         {"type": ["boolean"]            }
-        json_obj =          {"type": ["object"]             }
-        json_arr =          {"type": ["array"]              }
-        json_super =        {"type": "super"                }
-        json_super_list =   {"type": ["super"]              }
-        json_super_null =   {"type": ["super", "null"]      }
-        json_obj_super =    {"type": ["object"]             , "format": "super"}
-
-        # Mapping from JSON schema types ot Redshift column types
-        assert mapper(json_str)          == 'character varying(10000)'
-        assert mapper(json_str_or_null)  == 'character varying(10000)'
-        assert mapper(json_dt)           == 'timestamp without time zone'
-        assert mapper(json_dt_or_null)   == 'timestamp without time zone'
-        assert mapper(json_t)            == 'character varying(256)'
-        assert mapper(json_t_or_null)    == 'character varying(256)'
-        assert mapper(json_num)          == 'double precision'
-        assert mapper(json_int)          == 'numeric'
-        assert mapper(json_int_or_str)   == 'character varying(65535)'
-        assert mapper(json_bool)         == 'boolean'
-        assert mapper(json_obj)          == 'character varying(65535)'
-        assert mapper(json_arr)          == 'character varying(65535)'
-        assert mapper(json_super)        == 'super'
-        assert mapper(json_super_list)   == 'super'
-        assert mapper(json_super_null)   == 'super'
-        assert mapper(json_obj_super)    == 'super'
-
-        # Test with maxLength that exceeds DEFAULT_VARCHAR_LENGTH
-        json_str_long = {"type": ["string"], "maxLength": 50000}
-        assert mapper(json_str_long) == 'character varying(65535)'
-
-        # Test with_length=False parameter
-        json_str_no_length = {"type": ["string"]}
-        assert mapper(json_str_no_length, with_length=False) == 'character varying'
-
-        json_obj_no_length = {"type": ["object"]}
-        assert mapper(json_obj_no_length, with_length=False) == 'character varying'
-
-        json_time_no_length = {"type": ["string"], "format": "time"}
-        assert mapper(json_time_no_length, with_length=False) == 'character varying'
+        assert target_redshift.db_sync.column_type(schema_property) == expected_type
+
+
+    @pytest.mark.parametrize('schema_property', [
+        {"type": ["string"]},
+        {"type": ["object"]},
+        {"type": ["string"], "format": "time"},
+    ])
+    def test_column_type_mapping_without_length(self, schema_property):
+        """Test that with_length=False drops the varchar length"""
+        assert target_redshift.db_sync.column_type(schema_property, with_length=False) == 'character varying'
 
 
     def test_column_trans_mapping(self):
@@ -439,43 +400,33 @@ class TestTargetRedshift(object):
         # NO FLATTENNING - Record with simple properties should be a plain dictionary
         assert flatten_record(not_nested_record) == not_nested_record
 
-        nested_record = {
-            "c_pk": 1,
-            "c_varchar": "1",
-            "c_int": 1,
-            "c_obj": {
-                "nested_prop1": "value_1",
-                "nested_prop2": "value_2",
-                "nested_prop3": {
-                    "multi_nested_prop1": "multi_value_1",
-                    "multi_nested_prop2": "multi_value_2",
-                }}}
 
+    @pytest.mark.parametrize('flatten_kwargs, expected', [
         # NO FLATTENNING - No flattening (default)
-        assert \
-            flatten_record(nested_record) == \
+        (
+            {},
             {
                 "c_pk": 1,
                 "c_varchar": "1",
                 "c_int": 1,
                 "c_obj": '{"nested_prop1": "value_1", "nested_prop2": "value_2", "nested_prop3": {"multi_nested_prop1": "multi_value_1", "multi_nested_prop2": "multi_value_2"}}'
             }
-
+        ),
         # NO FLATTENNING
         #   max_level: 0 : No flattening (default)
-        assert \
-            flatten_record(nested_record, max_level=0) == \
+        (
+            {'max_level': 0},
             {
                 "c_pk": 1,
                 "c_varchar": "1",
                 "c_int": 1,
                 "c_obj": '{"nested_prop1": "value_1", "nested_prop2": "value_2", "nested_prop3": {"multi_nested_prop1": "multi_value_1", "multi_nested_prop2": "multi_value_2"}}'
             }
-
+        ),
         # SEMI FLATTENNING
         #   max_level: 1 : Semi-flattening (default)
-        assert \
-            flatten_record(nested_record, max_level=1) == \
+        (
+            {'max_level': 1},
             {
                 "c_pk": 1,
                 "c_varchar": "1",
@@ -484,10 +435,10 @@ class TestTargetRedshift(object):
                 "c_obj__nested_prop2": "value_2",
                 "c_obj__nested_prop3": '{"multi_nested_prop1": "multi_value_1", "multi_nested_prop2": "multi_value_2"}'
             }
-
+        ),
         # FLATTENNING
-        assert \
-            flatten_record(nested_record, max_level=10) == \
+        (
+            {'max_level': 10},
             {
                 "c_pk": 1,
                 "c_varchar": "1",
@@ -497,6 +448,23 @@ class TestTargetRedshift(object):
                 "c_obj__nested_prop3__multi_nested_prop1": "multi_value_1",
                 "c_obj__nested_prop3__multi_nested_prop2": "multi_value_2"
             }
+        ),
+    ], ids=['default', 'max-level-0', 'max-level-1', 'max-level-10'])
+    def test_flatten_nested_record(self, flatten_kwargs, expected):
+        """Test flattening of nested RECORD messages at different max levels"""
+        nested_record = {
+            "c_pk": 1,
+            "c_varchar": "1",
+            "c_int": 1,
+            "c_obj": {
+                "nested_prop1": "value_1",
+                "nested_prop2": "value_2",
+                "nested_prop3": {
+                    "multi_nested_prop1": "multi_value_1",
+                    "multi_nested_prop2": "multi_value_2",
+                }}}
+
+        assert target_redshift.db_sync.flatten_record(nested_record, **flatten_kwargs) == expected
 
     def test_flatten_record_with_flatten_schema(self):
         flatten_record = target_redshift.db_sync.flatten_record
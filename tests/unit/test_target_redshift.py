@@ -1,11 +1,44 @@
 """Unit tests for target_redshift utility functions"""
+import io
+import re
 import pytest
 import json
-from datetime import datetime
 from decimal import Decimal
+from types import SimpleNamespace
 from unittest import mock
 import target_redshift
 from target_redshift import RecordValidationException, InvalidValidationOperationException
+from target_redshift.db_sync import (
+    DbSync,
+    column_clause,
+    column_trans,
+    column_type,
+    flatten_key,
+    flatten_record,
+    flatten_schema,
+    primary_column_names,
+    safe_column_name,
+    stream_name_to_dict,
+    validate_config,
+    _should_json_dump_value,
+)
+
+# Compiled once; cheaper than round-tripping through datetime.fromisoformat
+_ISO_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}')
+
+# Shared by the _should_json_dump_value cases that need a flatten schema
+_JSON_DUMP_SCHEMA = {'field': {'type': 'string'}}
+
+
+def _schema_message(properties):
+    """SCHEMA message envelope around the given properties"""
+    return {
+        'type': 'SCHEMA',
+        'stream': 'test_stream',
+        'schema': {
+            'properties': properties
+        }
+    }
 
 
 class TestUtilityFunctions:
@@ -51,6 +84,25 @@ class TestUtilityFunctions:
         assert isinstance(result['items'][1]['price'], Decimal)
         assert str(result['total']) == '42.99'
 
+    def test_float_to_decimal_with_large_structure(self):
+        """Test converting a large nested structure exercises the fast path"""
+        record = {
+            'rows': [{'id': i, 'value': i + 0.5} for i in range(10000)]
+        }
+        result = target_redshift.float_to_decimal(record)
+        assert len(result['rows']) == 10000
+        assert isinstance(result['rows'][0]['value'], Decimal)
+        assert isinstance(result['rows'][-1]['value'], Decimal)
+        assert str(result['rows'][-1]['value']) == '9999.5'
+        assert result['rows'][-1]['id'] == 9999
+
+    def test_float_to_decimal_caches_repeated_values(self):
+        """Test repeated float values hit the bounded conversion cache"""
+        target_redshift._float_to_decimal.cache_clear()
+        results = [target_redshift.float_to_decimal(99.99) for _ in range(1000)]
+        assert all(r == Decimal('99.99') for r in results)
+        assert target_redshift._float_to_decimal.cache_info().hits >= 999
+
     def test_float_to_decimal_with_non_float(self):
         """Test that non-float values pass through unchanged"""
         # Strings
@@ -64,16 +116,10 @@ class TestUtilityFunctions:
 
     def test_add_metadata_columns_to_schema(self):
         """Test adding metadata columns to schema"""
-        schema_message = {
-            'type': 'SCHEMA',
-            'stream': 'test_stream',
-            'schema': {
-                'properties': {
-                    'id': {'type': 'integer'},
-                    'name': {'type': 'string'}
-                }
-            }
-        }
+        schema_message = _schema_message({
+            'id': {'type': 'integer'},
+            'name': {'type': 'string'}
+        })
 
         result = target_redshift.add_metadata_columns_to_schema(schema_message)
 
@@ -93,20 +139,11 @@ class TestUtilityFunctions:
         assert result['schema']['properties']['_sdc_batched_at']['format'] == 'date-time'
         assert result['schema']['properties']['_sdc_deleted_at']['type'] == ['null', 'string']
 
-    def test_add_metadata_values_to_record(self):
+    def test_add_metadata_values_to_record(self, base_record_message):
         """Test adding metadata values to record"""
-        record_message = {
-            'type': 'RECORD',
-            'stream': 'test_stream',
-            'record': {
-                'id': 1,
-                'name': 'Test'
-            },
-            'time_extracted': '2024-01-15T10:30:00Z'
-        }
         stream_to_sync = {}
 
-        result = target_redshift.add_metadata_values_to_record(record_message, stream_to_sync)
+        result = target_redshift.add_metadata_values_to_record(base_record_message, stream_to_sync)
 
         # Check original fields
         assert result['id'] == 1
@@ -115,24 +152,15 @@ class TestUtilityFunctions:
         # Check metadata fields
         assert result['_sdc_extracted_at'] == '2024-01-15T10:30:00Z'
         assert '_sdc_batched_at' in result
-        # Verify batched_at is a valid ISO datetime
-        datetime.fromisoformat(result['_sdc_batched_at'].replace('Z', '+00:00'))
+        # Verify batched_at looks like an ISO datetime
+        assert _ISO_TIMESTAMP_RE.match(result['_sdc_batched_at'])
 
-    def test_add_metadata_values_to_record_with_deleted(self):
+    def test_add_metadata_values_to_record_with_deleted(self, base_record_message):
         """Test adding metadata to a deleted record"""
-        record_message = {
-            'type': 'RECORD',
-            'stream': 'test_stream',
-            'record': {
-                'id': 1,
-                'name': 'Test',
-                '_sdc_deleted_at': '2024-01-15T12:00:00Z'
-            },
-            'time_extracted': '2024-01-15T10:30:00Z'
-        }
+        base_record_message['record']['_sdc_deleted_at'] = '2024-01-15T12:00:00Z'
         stream_to_sync = {}
 
-        result = target_redshift.add_metadata_values_to_record(record_message, stream_to_sync)
+        result = target_redshift.add_metadata_values_to_record(base_record_message, stream_to_sync)
 
         # Check that deleted_at was preserved
         assert result['_sdc_deleted_at'] == '2024-01-15T12:00:00Z'
@@ -170,7 +198,7 @@ class TestUtilityFunctions:
         result = target_redshift.get_schema_names_from_config(config)
         assert result == []
 
-    def test_emit_state(self, capsys):
+    def test_emit_state(self, monkeypatch):
         """Test state emission to stdout"""
         state = {
             'currently_syncing': 'test_stream',
@@ -181,20 +209,23 @@ class TestUtilityFunctions:
             }
         }
 
+        buf = io.StringIO()
+        monkeypatch.setattr('sys.stdout', buf)
         target_redshift.emit_state(state)
 
-        captured = capsys.readouterr()
-        assert 'currently_syncing' in captured.out
-        assert 'test_stream' in captured.out
-        assert 'bookmarks' in captured.out
+        output = buf.getvalue()
+        assert 'currently_syncing' in output
+        assert 'test_stream' in output
+        assert 'bookmarks' in output
 
-    def test_emit_state_with_none(self, capsys):
+    def test_emit_state_with_none(self, monkeypatch):
         """Test that emit_state handles None gracefully"""
+        buf = io.StringIO()
+        monkeypatch.setattr('sys.stdout', buf)
         target_redshift.emit_state(None)
 
-        captured = capsys.readouterr()
         # Should not emit anything for None
-        assert captured.out == ''
+        assert buf.getvalue() == ''
 
 
 class TestRecordProcessing:
@@ -221,38 +252,36 @@ class TestRecordProcessing:
         assert isinstance(result, Decimal)
         assert str(result) == '0.0'
 
+    def test_float_to_decimal_non_finite_in_container(self):
+        """Test non-finite floats inside containers match the scalar path"""
+        result = target_redshift.float_to_decimal({
+            'nan': float('nan'),
+            'values': [float('inf'), float('-inf'), 1.5]
+        })
+        assert isinstance(result['nan'], Decimal)
+        assert result['nan'].is_nan()
+        assert result['values'][0] == Decimal('Infinity')
+        assert result['values'][1] == Decimal('-Infinity')
+        assert result['values'][2] == Decimal('1.5')
+
     def test_add_metadata_columns_overwrites_existing(self):
         """Test that metadata columns are always set to standard format"""
-        schema_message = {
-            'type': 'SCHEMA',
-            'stream': 'test_stream',
-            'schema': {
-                'properties': {
-                    'id': {'type': 'integer'},
-                    '_sdc_extracted_at': {'type': 'string', 'format': 'custom'}
-                }
-            }
-        }
+        schema_message = _schema_message({
+            'id': {'type': 'integer'},
+            '_sdc_extracted_at': {'type': 'string', 'format': 'custom'}
+        })
 
         result = target_redshift.add_metadata_columns_to_schema(schema_message)
 
         # Should overwrite to standard format
         assert result['schema']['properties']['_sdc_extracted_at']['format'] == 'date-time'
 
-    def test_add_metadata_values_without_time_extracted(self):
+    def test_add_metadata_values_without_time_extracted(self, base_record_message):
         """Test adding metadata when time_extracted is missing"""
-        record_message = {
-            'type': 'RECORD',
-            'stream': 'test_stream',
-            'record': {
-                'id': 1,
-                'name': 'Test'
-            }
-            # No time_extracted field
-        }
+        del base_record_message['time_extracted']
         stream_to_sync = {}
 
-        result = target_redshift.add_metadata_values_to_record(record_message, stream_to_sync)
+        result = target_redshift.add_metadata_values_to_record(base_record_message, stream_to_sync)
 
         # Should still add metadata fields
         assert '_sdc_batched_at' in result
@@ -317,268 +346,97 @@ class TestRecordProcessing:
 class TestDbSyncUtilities:
     """Test additional db_sync utility functions"""
 
-    def test_column_type_with_integer_and_string(self):
-        """Test column type for mixed integer/string"""
-        from target_redshift.db_sync import column_type
-
-        schema_property = {
-            'type': ['null', 'integer', 'string']
-        }
-        result = column_type(schema_property)
-        assert 'character varying' in result
-        # Should default to LONG_VARCHAR_LENGTH
-        assert '65535' in result
-
-    def test_column_type_boolean(self):
-        """Test column type for boolean"""
-        from target_redshift.db_sync import column_type
-
-        schema_property = {
-            'type': ['null', 'boolean']
-        }
-        result = column_type(schema_property, with_length=False)
-        assert result == 'boolean'
-
-    def test_column_type_number(self):
-        """Test column type for number (float)"""
-        from target_redshift.db_sync import column_type
-
-        schema_property = {
-            'type': ['null', 'number']
-        }
-        result = column_type(schema_property, with_length=False)
-        assert result == 'double precision'
-
-    def test_column_trans_with_super_type(self):
-        """Test column transformation for SUPER type"""
-        from target_redshift.db_sync import column_trans
-
-        # Test with 'super' in type
-        schema_property = {
-            'type': ['null', 'super']
-        }
-        result = column_trans(schema_property)
-        assert result == ''
-
-    def test_column_trans_with_super_format(self):
-        """Test column transformation for SUPER format"""
-        from target_redshift.db_sync import column_trans
-
-        # Test with format='super'
-        schema_property = {
-            'type': ['null', 'string'],
-            'format': 'super'
-        }
-        result = column_trans(schema_property)
-        assert result == ''
-
-    def test_column_trans_with_object(self):
-        """Test column transformation for object type"""
-        from target_redshift.db_sync import column_trans
-
-        schema_property = {
-            'type': ['null', 'object']
-        }
-        result = column_trans(schema_property)
-        assert result == 'parse_json'
-
-    def test_column_trans_with_array(self):
-        """Test column transformation for array type"""
-        from target_redshift.db_sync import column_trans
-
-        schema_property = {
-            'type': ['null', 'array']
-        }
-        result = column_trans(schema_property)
-        assert result == 'parse_json'
-
-    def test_column_trans_with_string(self):
-        """Test column transformation for plain string"""
-        from target_redshift.db_sync import column_trans
-
-        schema_property = {
-            'type': ['null', 'string']
-        }
-        result = column_trans(schema_property)
-        assert result == ''
+    @pytest.mark.parametrize('schema_property, with_length, expected', [
+        # Mixed integer/string defaults to LONG_VARCHAR_LENGTH
+        ({'type': ['null', 'integer', 'string']},                True,  'character varying(65535)'),
+        ({'type': ['null', 'boolean']},                          False, 'boolean'),
+        ({'type': ['null', 'number']},                           False, 'double precision'),
+        ({'type': ['null', 'integer']},                          False, 'numeric'),
+        # date-time format is converted to timestamp
+        ({'type': ['null', 'string'], 'format': 'date-time'},    False, 'timestamp without time zone'),
+        # date format doesn't get special treatment, remains varchar
+        ({'type': ['null', 'string'], 'format': 'date'},         False, 'character varying'),
+        # maxLength below the default is not directly used, uses default VARCHAR length
+        ({'type': ['null', 'string'], 'maxLength': 255},         True,  'character varying(10000)'),
+    ], ids=['integer-and-string', 'boolean', 'number', 'integer', 'date-time', 'date', 'maxlength'])
+    def test_column_type(self, schema_property, with_length, expected):
+        """Test column type mappings"""
+        assert column_type(schema_property, with_length=with_length) == expected
+
+    @pytest.mark.parametrize('schema_property, expected', [
+        # SUPER (in type or format) doesn't need the parse_json transformation
+        ({'type': ['null', 'super']},                       ''),
+        ({'type': ['null', 'string'], 'format': 'super'},   ''),
+        ({'type': ['null', 'object']},                      'parse_json'),
+        ({'type': ['null', 'array']},                       'parse_json'),
+        ({'type': ['null', 'string']},                      ''),
+    ], ids=['super-type', 'super-format', 'object', 'array', 'string'])
+    def test_column_trans(self, schema_property, expected):
+        """Test column transformation mappings"""
+        assert column_trans(schema_property) == expected
 
     def test_flatten_key_simple(self):
         """Test flatten_key with simple key"""
-        from target_redshift.db_sync import flatten_key
-
         result = flatten_key('child', ['parent'], '__')
         assert result == 'parent__child'
 
     def test_flatten_key_with_empty_parent(self):
         """Test flatten_key with no parent"""
-        from target_redshift.db_sync import flatten_key
-
         result = flatten_key('key', [], '__')
         assert result == 'key'
 
     def test_flatten_key_with_multiple_parents(self):
         """Test flatten_key with nested parents"""
-        from target_redshift.db_sync import flatten_key
-
         result = flatten_key('child', ['grandparent', 'parent'], '__')
         assert result == 'grandparent__parent__child'
 
-    def test_primary_column_names_single_key(self):
-        """Test extracting primary key from schema"""
-        from target_redshift.db_sync import primary_column_names
-
-        stream_schema_message = {
-            'key_properties': ['id']
-        }
-        result = primary_column_names(stream_schema_message)
-        assert result == ['"ID"']
-
-    def test_primary_column_names_composite_key(self):
-        """Test extracting composite primary key"""
-        from target_redshift.db_sync import primary_column_names
-
-        stream_schema_message = {
-            'key_properties': ['org_id', 'user_id']
-        }
-        result = primary_column_names(stream_schema_message)
-        assert result == ['"ORG_ID"', '"USER_ID"']
-
-    def test_primary_column_names_no_keys(self):
-        """Test extracting primary keys when none defined"""
-        from target_redshift.db_sync import primary_column_names
-
-        stream_schema_message = {
-            'key_properties': []
-        }
-        result = primary_column_names(stream_schema_message)
-        assert result == []
-
-    def test_stream_name_to_dict_full(self):
-        """Test parsing stream name with catalog-schema-table"""
-        from target_redshift.db_sync import stream_name_to_dict
-
-        result = stream_name_to_dict('my_catalog-my_schema-my_table')
-        assert result['catalog_name'] == 'my_catalog'
-        assert result['schema_name'] == 'my_schema'
-        assert result['table_name'] == 'my_table'
-
-    def test_stream_name_to_dict_schema_table(self):
-        """Test parsing stream name with schema-table"""
-        from target_redshift.db_sync import stream_name_to_dict
-
-        result = stream_name_to_dict('my_schema-my_table')
-        assert result['catalog_name'] is None
-        assert result['schema_name'] == 'my_schema'
-        assert result['table_name'] == 'my_table'
-
-    def test_stream_name_to_dict_table_only(self):
-        """Test parsing stream name with table only"""
-        from target_redshift.db_sync import stream_name_to_dict
-
-        result = stream_name_to_dict('my_table')
-        assert result['catalog_name'] is None
-        assert result['schema_name'] is None
-        assert result['table_name'] == 'my_table'
-
-    def test_stream_name_to_dict_custom_separator(self):
-        """Test parsing stream name with custom separator"""
-        from target_redshift.db_sync import stream_name_to_dict
-
-        result = stream_name_to_dict('catalog_schema_table', separator='_')
-        assert result['catalog_name'] == 'catalog'
-        assert result['schema_name'] == 'schema'
-        assert result['table_name'] == 'table'
-
-    def test_should_json_dump_value_with_dict(self):
-        """Test _should_json_dump_value with dictionary"""
-        from target_redshift.db_sync import _should_json_dump_value
-
-        value = {'key': 'value'}
-        result = _should_json_dump_value('field', value)
-        assert result is True
-
-    def test_should_json_dump_value_with_list(self):
-        """Test _should_json_dump_value with list"""
-        from target_redshift.db_sync import _should_json_dump_value
-
-        value = [1, 2, 3]
-        result = _should_json_dump_value('field', value)
-        assert result is True
-
-    def test_should_json_dump_value_with_string(self):
-        """Test _should_json_dump_value with string"""
-        from target_redshift.db_sync import _should_json_dump_value
-
-        value = "simple string"
-        result = _should_json_dump_value('field', value)
-        assert result is False
-
-    def test_should_json_dump_value_with_flatten_schema_requiring_dump(self):
-        """Test _should_json_dump_value with flatten schema that requires JSON dump"""
-        from target_redshift.db_sync import _should_json_dump_value
-
-        flatten_schema = {
-            'field': {'type': 'string'}  # Will require JSON dump for complex types
-        }
-        value = {'nested': 'object'}
-        result = _should_json_dump_value('field', value, flatten_schema)
-        assert result is True
-
-    def test_column_type_with_date_formats(self):
-        """Test column type detection for date/time types"""
-        from target_redshift.db_sync import column_type
-
-        # date-time format - properly converted to timestamp
-        schema_property = {
-            'type': ['null', 'string'],
-            'format': 'date-time'
-        }
-        result = column_type(schema_property, with_length=False)
-        assert result == 'timestamp without time zone'
-
-        # date format - only date-time is converted, others remain varchar
-        schema_property = {
-            'type': ['null', 'string'],
-            'format': 'date'
-        }
-        result = column_type(schema_property, with_length=False)
-        # date format doesn't get special treatment, remains varchar
-        assert 'character varying' in result or result == 'character varying'
-
-    def test_column_type_with_maxlength(self):
-        """Test column type uses default length regardless of maxLength"""
-        from target_redshift.db_sync import column_type
-
-        schema_property = {
-            'type': ['null', 'string'],
-            'maxLength': 255
-        }
-        result = column_type(schema_property)
-        # maxLength is not directly used, uses default VARCHAR length
-        assert 'character varying' in result
-
-    def test_column_type_integer(self):
-        """Test column type for integer"""
-        from target_redshift.db_sync import column_type
-
-        schema_property = {
-            'type': ['null', 'integer']
-        }
-        result = column_type(schema_property, with_length=False)
-        assert result == 'numeric'
+    @pytest.mark.parametrize('key_properties, expected', [
+        ([],                    []),
+        (['id'],                ['"ID"']),
+        (['org_id', 'user_id'], ['"ORG_ID"', '"USER_ID"']),
+    ], ids=['no-keys', 'single-key', 'composite-key'])
+    def test_primary_column_names(self, key_properties, expected):
+        """Test extracting primary key columns from a stream schema message"""
+        assert primary_column_names({'key_properties': key_properties}) == expected
+
+    @pytest.mark.parametrize('stream_name, separator, catalog, schema, table', [
+        ('my_catalog-my_schema-my_table', '-', 'my_catalog', 'my_schema', 'my_table'),
+        ('my_schema-my_table',            '-', None,         'my_schema', 'my_table'),
+        ('my_table',                      '-', None,         None,        'my_table'),
+        ('catalog_schema_table',          '_', 'catalog',    'schema',    'table'),
+    ], ids=['full', 'schema-table', 'table-only', 'custom-separator'])
+    def test_stream_name_to_dict(self, stream_name, separator, catalog, schema, table):
+        """Test parsing stream names into catalog/schema/table parts"""
+        result = stream_name_to_dict(stream_name, separator=separator)
+        assert result['catalog_name'] == catalog
+        assert result['schema_name'] == schema
+        assert result['table_name'] == table
+
+    @pytest.mark.parametrize('value, flatten_schema, expected', [
+        ({'key': 'value'},      None,                 True),
+        ([1, 2, 3],             None,                 True),
+        ('simple string',       None,                 False),
+        # Schema marks 'field' as string; complex values still get dumped
+        ({'nested': 'object'},  _JSON_DUMP_SCHEMA,    True),
+        (True,                  None,                 False),
+        (False,                 None,                 False),
+        (42,                    None,                 False),
+        (3.14,                  None,                 False),
+        (Decimal('10.5'),       None,                 False),
+    ], ids=['dict', 'list', 'string', 'schema-dump', 'true', 'false',
+            'int', 'float', 'decimal'])
+    def test_should_json_dump_value(self, value, flatten_schema, expected):
+        """Test _should_json_dump_value across value types"""
+        assert _should_json_dump_value('field', value, flatten_schema) is expected
 
     def test_flatten_key_with_special_characters(self):
         """Test flatten_key handles special characters"""
-        from target_redshift.db_sync import flatten_key
-
         result = flatten_key('child-name', ['parent.name'], '__')
         # Should handle special characters in keys
         assert '__' in result
 
     def test_stream_name_to_dict_edge_cases(self):
         """Test stream_name_to_dict with edge cases"""
-        from target_redshift.db_sync import stream_name_to_dict
-
         # Empty string
         result = stream_name_to_dict('')
         assert result['table_name'] == ''
@@ -590,45 +448,25 @@ class TestDbSyncUtilities:
         # Table name has hyphens converted to underscores
         assert result['table_name'] == 'c_d_e'
 
-    def test_should_json_dump_value_with_boolean(self):
-        """Test _should_json_dump_value with boolean"""
-        from target_redshift.db_sync import _should_json_dump_value
-
-        result = _should_json_dump_value('field', True)
-        assert result is False
-
-        result = _should_json_dump_value('field', False)
-        assert result is False
-
-    def test_should_json_dump_value_with_numbers(self):
-        """Test _should_json_dump_value with numeric types"""
-        from target_redshift.db_sync import _should_json_dump_value
-
-        # Integer
-        result = _should_json_dump_value('field', 42)
-        assert result is False
-
-        # Float
-        result = _should_json_dump_value('field', 3.14)
-        assert result is False
-
-        # Decimal
-        result = _should_json_dump_value('field', Decimal('10.5'))
-        assert result is False
-
 
 class TestLoadTableCache:
     """Test load_table_cache function"""
 
-    @mock.patch('target_redshift.DbSync')
-    def test_load_table_cache_enabled(self, mock_db_sync):
+    @pytest.fixture
+    def mock_db_instance(self):
+        """Patch DbSync and yield a stub instance; only get_table_columns
+        stays a MagicMock so call assertions keep working"""
+        with mock.patch('target_redshift.DbSync') as mock_db_sync:
+            instance = SimpleNamespace(get_table_columns=mock.MagicMock())
+            mock_db_sync.return_value = instance
+            yield instance
+
+    def test_load_table_cache_enabled(self, mock_db_instance):
         """Test load_table_cache when cache is enabled"""
-        mock_db_instance = mock.Mock()
         mock_db_instance.get_table_columns.return_value = [
             {'schema': 'public', 'table': 'users', 'column': 'id'},
             {'schema': 'public', 'table': 'users', 'column': 'name'}
         ]
-        mock_db_sync.return_value = mock_db_instance
 
         config = {
             'host': 'localhost',
@@ -651,15 +489,12 @@ class TestLoadTableCache:
 
         assert result == []
 
-    @mock.patch('target_redshift.DbSync')
-    def test_load_table_cache_with_multiple_schemas(self, mock_db_sync):
+    def test_load_table_cache_with_multiple_schemas(self, mock_db_instance):
         """Test load_table_cache loads from all configured schemas"""
-        mock_db_instance = mock.Mock()
         mock_db_instance.get_table_columns.return_value = [
             {'schema': 'public', 'table': 'users', 'column': 'id'},
             {'schema': 'analytics', 'table': 'events', 'column': 'event_id'}
         ]
-        mock_db_sync.return_value = mock_db_instance
 
         config = {
             'host': 'localhost',
@@ -737,8 +572,6 @@ class TestColumnSanitization:
 
     def test_safe_column_name(self):
         """Test safe_column_name function from db_sync"""
-        from target_redshift.db_sync import safe_column_name
-
         # Normal column names
         assert safe_column_name('user_id') == '"USER_ID"'
         assert safe_column_name('email') == '"EMAIL"'
@@ -753,8 +586,6 @@ class TestColumnSanitization:
 
     def test_column_name_with_reserved_words(self):
         """Test handling of SQL reserved words as column names"""
-        from target_redshift.db_sync import safe_column_name
-
         # SQL reserved words should be quoted
         assert safe_column_name('select') == '"SELECT"'
         assert safe_column_name('from') == '"FROM"'
@@ -766,8 +597,6 @@ class TestConfigValidation:
 
     def test_validate_config_with_valid_config(self):
         """Test validation with all required fields"""
-        from target_redshift.db_sync import validate_config
-
         config = {
             'host': 'localhost',
             'port': 5439,
@@ -782,8 +611,6 @@ class TestConfigValidation:
 
     def test_validate_config_missing_host(self):
         """Test validation with missing host"""
-        from target_redshift.db_sync import validate_config
-
         config = {
             'port': 5439,
             'user': 'testuser',
@@ -797,8 +624,6 @@ class TestConfigValidation:
 
     def test_validate_config_missing_s3_bucket_without_local_copy(self):
         """Test validation with missing S3 bucket and no local copy mode"""
-        from target_redshift.db_sync import validate_config
-
         config = {
             'host': 'localhost',
             'port': 5439,
@@ -813,8 +638,6 @@ class TestConfigValidation:
 
     def test_validate_config_with_local_copy(self):
         """Test validation with local copy mode enabled"""
-        from target_redshift.db_sync import validate_config
-
         config = {
             'host': 'localhost',
             'port': 5439,
@@ -829,8 +652,6 @@ class TestConfigValidation:
 
     def test_validate_config_missing_schema_mapping(self):
         """Test validation with missing schema configuration"""
-        from target_redshift.db_sync import validate_config
-
         config = {
             'host': 'localhost',
             'port': 5439,
@@ -845,8 +666,6 @@ class TestConfigValidation:
 
     def test_validate_config_with_schema_mapping(self):
         """Test validation with schema_mapping instead of default_target_schema"""
-        from target_redshift.db_sync import validate_config
-
         config = {
             'host': 'localhost',
             'port': 5439,
@@ -869,16 +688,12 @@ class TestFlattenFunctions:
 
     def test_flatten_record_simple(self):
         """Test flattening a simple record"""
-        from target_redshift.db_sync import flatten_record
-
         record = {'id': 1, 'name': 'test'}
         result = flatten_record(record, max_level=0)
         assert result == {'id': 1, 'name': 'test'}
 
     def test_flatten_record_nested_with_max_level(self):
         """Test flattening nested record with max_level"""
-        from target_redshift.db_sync import flatten_record
-
         record = {
             'id': 1,
             'user': {
@@ -900,8 +715,6 @@ class TestFlattenFunctions:
 
     def test_flatten_record_with_flatten_schema(self):
         """Test flattening record with specific flatten schema"""
-        from target_redshift.db_sync import flatten_record
-
         record = {
             'id': 1,
             'data': {'key': 'value'},
@@ -924,8 +737,6 @@ class TestFlattenFunctions:
 
     def test_flatten_key_simple(self):
         """Test flatten_key with simple keys"""
-        from target_redshift.db_sync import flatten_key
-
         result = flatten_key('name', [], '__')
         assert result == 'name'
 
@@ -934,8 +745,6 @@ class TestFlattenFunctions:
 
     def test_flatten_key_very_long_key(self):
         """Test flatten_key with very long keys that exceed 127 characters"""
-        from target_redshift.db_sync import flatten_key
-
         # Create a very long key
         long_key = 'a' * 50
         parent = ['b' * 50]
@@ -946,15 +755,11 @@ class TestFlattenFunctions:
 
     def test_flatten_key_with_multiple_parents(self):
         """Test flatten_key with multiple parent keys"""
-        from target_redshift.db_sync import flatten_key
-
         result = flatten_key('field', ['level1', 'level2', 'level3'], '__')
         assert result == 'level1__level2__level3__field'
 
     def test_flatten_schema_simple(self):
         """Test flatten_schema with simple schema"""
-        from target_redshift.db_sync import flatten_schema
-
         schema = {
             'properties': {
                 'id': {'type': ['integer']},
@@ -968,8 +773,6 @@ class TestFlattenFunctions:
 
     def test_flatten_schema_nested(self):
         """Test flatten_schema with nested schema"""
-        from target_redshift.db_sync import flatten_schema
-
         schema = {
             'properties': {
                 'id': {'type': ['integer']},
@@ -991,42 +794,42 @@ class TestFlattenFunctions:
 
     def test_flatten_schema_without_properties(self):
         """Test flatten_schema with schema without properties"""
-        from target_redshift.db_sync import flatten_schema
-
         schema = {'type': 'object'}
         result = flatten_schema(schema, max_level=0)
         assert result == {}
 
 
+CSV_TEST_CONFIG = {
+    'host': 'localhost',
+    'port': 5439,
+    'user': 'test',
+    'password': 'test',
+    'dbname': 'test',
+    'use_local_copy': True,
+    'default_target_schema': 'public'
+}
+
+
+def _csv_db_sync(properties):
+    """DbSync wired for local-copy CSV tests with the given schema properties"""
+    return DbSync(dict(CSV_TEST_CONFIG), {
+        'stream': 'test_stream',
+        'schema': {
+            'properties': properties
+        },
+        'key_properties': ['id']
+    })
+
+
 class TestCSVGeneration:
     """Test CSV line generation and escaping"""
 
     def test_record_to_csv_line_simple(self):
         """Test CSV generation with simple values"""
-        from target_redshift.db_sync import DbSync
-
-        config = {
-            'host': 'localhost',
-            'port': 5439,
-            'user': 'test',
-            'password': 'test',
-            'dbname': 'test',
-            'use_local_copy': True,
-            'default_target_schema': 'public'
-        }
-
-        schema_message = {
-            'stream': 'test_stream',
-            'schema': {
-                'properties': {
-                    'id': {'type': ['integer']},
-                    'name': {'type': ['string']}
-                }
-            },
-            'key_properties': ['id']
-        }
-
-        db_sync = DbSync(config, schema_message)
+        db_sync = _csv_db_sync({
+            'id': {'type': ['integer']},
+            'name': {'type': ['string']}
+        })
         record = {'id': 1, 'name': 'test'}
 
         csv_line = db_sync.record_to_csv_line(record)
@@ -1036,30 +839,10 @@ class TestCSVGeneration:
 
     def test_record_to_csv_line_with_special_characters(self):
         """Test CSV generation with special characters that need escaping"""
-        from target_redshift.db_sync import DbSync
-
-        config = {
-            'host': 'localhost',
-            'port': 5439,
-            'user': 'test',
-            'password': 'test',
-            'dbname': 'test',
-            'use_local_copy': True,
-            'default_target_schema': 'public'
-        }
-
-        schema_message = {
-            'stream': 'test_stream',
-            'schema': {
-                'properties': {
-                    'id': {'type': ['integer']},
-                    'text': {'type': ['string']}
-                }
-            },
-            'key_properties': ['id']
-        }
-
-        db_sync = DbSync(config, schema_message)
+        db_sync = _csv_db_sync({
+            'id': {'type': ['integer']},
+            'text': {'type': ['string']}
+        })
 
         # Test with comma
         record = {'id': 1, 'text': 'value,with,commas'}
@@ -1073,31 +856,11 @@ class TestCSVGeneration:
 
     def test_record_to_csv_line_with_null_values(self):
         """Test CSV generation with NULL values"""
-        from target_redshift.db_sync import DbSync
-
-        config = {
-            'host': 'localhost',
-            'port': 5439,
-            'user': 'test',
-            'password': 'test',
-            'dbname': 'test',
-            'use_local_copy': True,
-            'default_target_schema': 'public'
-        }
-
-        schema_message = {
-            'stream': 'test_stream',
-            'schema': {
-                'properties': {
-                    'id': {'type': ['integer']},
-                    'name': {'type': ['null', 'string']},
-                    'age': {'type': ['null', 'integer']}
-                }
-            },
-            'key_properties': ['id']
-        }
-
-        db_sync = DbSync(config, schema_message)
+        db_sync = _csv_db_sync({
+            'id': {'type': ['integer']},
+            'name': {'type': ['null', 'string']},
+            'age': {'type': ['null', 'integer']}
+        })
         record = {'id': 1, 'name': None, 'age': None}
 
         csv_line = db_sync.record_to_csv_line(record)
@@ -1111,31 +874,11 @@ class TestCSVGeneration:
 
     def test_record_to_csv_line_with_zero_values(self):
         """Test CSV generation with zero values (should not be treated as null)"""
-        from target_redshift.db_sync import DbSync
-
-        config = {
-            'host': 'localhost',
-            'port': 5439,
-            'user': 'test',
-            'password': 'test',
-            'dbname': 'test',
-            'use_local_copy': True,
-            'default_target_schema': 'public'
-        }
-
-        schema_message = {
-            'stream': 'test_stream',
-            'schema': {
-                'properties': {
-                    'id': {'type': ['integer']},
-                    'count': {'type': ['integer']},
-                    'balance': {'type': ['number']}
-                }
-            },
-            'key_properties': ['id']
-        }
-
-        db_sync = DbSync(config, schema_message)
+        db_sync = _csv_db_sync({
+            'id': {'type': ['integer']},
+            'count': {'type': ['integer']},
+            'balance': {'type': ['number']}
+        })
         record = {'id': 1, 'count': 0, 'balance': 0.0}
 
         csv_line = db_sync.record_to_csv_line(record)
@@ -1195,8 +938,6 @@ class TestColumnClause:
 
     def test_column_clause_varchar(self):
         """Test column clause for varchar type"""
-        from target_redshift.db_sync import column_clause
-
         schema_property = {'type': ['string']}
         result = column_clause('name', schema_property)
 
@@ -1205,8 +946,6 @@ class TestColumnClause:
 
     def test_column_clause_integer(self):
         """Test column clause for integer type"""
-        from target_redshift.db_sync import column_clause
-
         schema_property = {'type': ['integer']}
         result = column_clause('id', schema_property)
 
@@ -1215,8 +954,6 @@ class TestColumnClause:
 
     def test_column_clause_timestamp(self):
         """Test column clause for timestamp type"""
-        from target_redshift.db_sync import column_clause
-
         schema_property = {'type': ['string'], 'format': 'date-time'}
         result = column_clause('created_at', schema_property)
 
@@ -1225,8 +962,6 @@ class TestColumnClause:
 
     def test_column_clause_boolean(self):
         """Test column clause for boolean type"""
-        from target_redshift.db_sync import column_clause
-
         schema_property = {'type': ['boolean']}
         result = column_clause('is_active', schema_property)
 
@@ -1235,8 +970,6 @@ class TestColumnClause:
 
     def test_column_clause_super_type(self):
         """Test column clause for Redshift SUPER type"""
-        from target_redshift.db_sync import column_clause
-
         schema_property = {'type': ['super']}
         result = column_clause('json_data', schema_property)
 
@@ -1249,8 +982,6 @@ class TestPrimaryKeyHandling:
 
     def test_primary_column_names_single_key(self):
         """Test primary_column_names with single key"""
-        from target_redshift.db_sync import primary_column_names
-
         schema_message = {'key_properties': ['id']}
         result = primary_column_names(schema_message)
 
@@ -1259,8 +990,6 @@ class TestPrimaryKeyHandling:
 
     def test_primary_column_names_composite_key(self):
         """Test primary_column_names with composite key"""
-        from target_redshift.db_sync import primary_column_names
-
         schema_message = {'key_properties': ['user_id', 'order_id']}
         result = primary_column_names(schema_message)
 
@@ -1270,8 +999,6 @@ class TestPrimaryKeyHandling:
 
     def test_primary_column_names_empty(self):
         """Test primary_column_names with no keys"""
-        from target_redshift.db_sync import primary_column_names
-
         schema_message = {'key_properties': []}
         result = primary_column_names(schema_message)
 
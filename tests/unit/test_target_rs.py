@@ -1,6 +1,6 @@
 import pytest
-import mock
 import os
+from unittest import mock
 
 import target_redshift
 
@@ -29,3 +29,27 @@ class TestTargetRedshift(object):
         target_redshift.persist_lines(self.config, lines)
 
         flush_streams_mock.assert_called_once()
+
+    @mock.patch('target_redshift.flush_streams')
+    @mock.patch('target_redshift.DbSync')
+    def test_persist_lines_with_batch_size_bytes_flushes_early_and_resets_counter(self, dbSync_mock,
+                                                                                  flush_streams_mock):
+        # RECORD lines in the resource file are 206-210 bytes, so a 1000 byte
+        # threshold is crossed on every 5th record. The 40 records produce
+        # exactly 8 size-based flushes only because the byte counter resets
+        # after each flush (without the reset every record past the 5th would
+        # flush), plus one final end-of-input flush.
+        self.config['batch_size_bytes'] = 1000
+
+        with open(f'{os.path.dirname(__file__)}/resources/logical-streams.json', 'r') as f:
+            lines = f.readlines()
+
+        instance = dbSync_mock.return_value
+        instance.create_schema_if_not_exists.return_value = None
+        instance.sync_table.return_value = None
+
+        flush_streams_mock.return_value = '{"currently_syncing": null}'
+
+        target_redshift.persist_lines(self.config, lines)
+
+        assert flush_streams_mock.call_count == 9